@@ -12,12 +12,12 @@ import argparse
 import logging
 import os
 import sys
-from huggingface_hub import HfApi
+from typing import TYPE_CHECKING
 
-from hf_utils import (
-    create_hash_file, download_with_progress, get_remote_lfs_hash,
-    parse_hf_url, verify_file_hash
-)
+# huggingface_hub and hf_utils are imported inside the functions that use them,
+# so --help and argument errors return without loading the Hub client
+if TYPE_CHECKING:
+    from huggingface_hub import HfApi
 
 # --- EXIT CODES ---
 EXIT_SUCCESS = 0
@@ -28,6 +28,52 @@ EXIT_VERIFICATION_FAILED = 3
 # --- CONFIGURATION ---
 MODELS_DIR = os.getenv('LLAMA_SWAP_MODELS_DIR', './models')
 
+def download_shards(api: 'HfApi', repo_id: str, filenames: list[str], dest_path: str,
+                    args: argparse.Namespace) -> None:
+    """Downloads all shards of a multi-file model concurrently, then verifies each one."""
+    from hf_utils import (
+        compare_file_hash, create_hash_file, download_many, get_remote_lfs_hash_from_info, get_repo_info
+    )
+
+    logging.info(f"Detected sharded model with {len(filenames)} parts.")
+
+    expected_hashes = {}
+    if not args.skip_verification:
+        # One metadata round-trip covers every shard
+        logging.info(f"Fetching remote hashes from {repo_id}...")
+        try:
+            repo_info = get_repo_info(api, repo_id)
+        except Exception as e:
+            logging.error(f"Failed to retrieve repository metadata for {repo_id}: {e}")
+            repo_info = None
+        for shard in filenames:
+            expected_hashes[shard] = get_remote_lfs_hash_from_info(repo_info, shard) if repo_info else None
+            if not expected_hashes[shard]:
+                logging.warning(f"Could not retrieve hash for {shard}. Proceeding without verification.")
+
+    # Each shard is hashed as it streams to disk, so verification needs no second read
+    downloaded_files = download_many(repo_id, filenames, dest_path, args.retries, args.retry_delay)
+
+    failed = [shard for shard, (path, _) in downloaded_files.items() if not path]
+    if failed:
+        logging.error(f"Failed to download: {', '.join(failed)}")
+        logging.error("\n--- Download Failed ---")
+        sys.exit(EXIT_DOWNLOAD_FAILED)
+
+    for shard, (downloaded_file, actual_hash) in downloaded_files.items():
+        expected_hash = expected_hashes.get(shard)
+        if expected_hash:
+            logging.info(f"Verifying file integrity for {os.path.basename(downloaded_file)}...")
+            if not compare_file_hash(downloaded_file, actual_hash, expected_hash):
+                logging.error("File integrity check failed. The downloaded file may be corrupted.")
+                sys.exit(EXIT_VERIFICATION_FAILED)
+            create_hash_file(downloaded_file, expected_hash)
+        elif not args.skip_verification:
+            logging.warning(f"Skipping hash file creation for {shard} (no hash available for verification).")
+
+    logging.info("\n--- Download Complete ---")
+    sys.exit(EXIT_SUCCESS)
+
 def main():
     """Main script logic."""
     parser = argparse.ArgumentParser(
@@ -62,6 +108,12 @@ def main():
         datefmt='%Y-%m-%d %H:%M:%S'
     )
 
+    from huggingface_hub import HfApi
+    from hf_utils import (
+        compare_file_hash, create_hash_file, download_with_hash, get_remote_lfs_hash,
+        get_shard_filenames, parse_hf_url
+    )
+
     api = HfApi()
     repo_id, filename = parse_hf_url(args.url)
 
@@ -78,6 +130,10 @@ def main():
     os.makedirs(dest_path, exist_ok=True)
     logging.info(f"Destination:   {dest_path}")
 
+    shard_filenames = get_shard_filenames(filename)
+    if len(shard_filenames) > 1:
+        download_shards(api, repo_id, shard_filenames, dest_path, args)
+
     # Retrieve expected hash before downloading
     expected_hash = None
     if not args.skip_verification:
@@ -85,8 +141,8 @@ def main():
         if not expected_hash:
             logging.warning("Could not retrieve hash. Proceeding without verification.")
 
-    # Download the file
-    downloaded_file = download_with_progress(repo_id, filename, dest_path, args.retries, args.retry_delay)
+    # Download the file, hashing it as it is written
+    downloaded_file, actual_hash = download_with_hash(repo_id, filename, dest_path, args.retries, args.retry_delay)
 
     if not downloaded_file:
         logging.error("\n--- Download Failed ---")
@@ -94,7 +150,8 @@ def main():
 
     # Verify integrity if hash was retrieved
     if expected_hash and not args.skip_verification:
-        if not verify_file_hash(downloaded_file, expected_hash):
+        logging.info(f"Verifying file integrity for {os.path.basename(downloaded_file)}...")
+        if not compare_file_hash(downloaded_file, actual_hash, expected_hash):
             logging.error("File integrity check failed. The downloaded file may be corrupted.")
             sys.exit(EXIT_VERIFICATION_FAILED)
 
@@ -9,7 +9,9 @@ Key Features:
 - SHA256 hash calculation and verification with progress bars
 - Hugging Face URL parsing
 - Download with retry logic and resume support
-- Local file integrity checking
+- Streaming download that hashes bytes as they arrive
+- Concurrent downloads of sharded (multi-file) GGUF models
+- Local file integrity checking (BLAKE3 sidecars when the blake3 package is installed)
 - Recursive .gguf file discovery
 
 Usage:
@@ -23,62 +25,196 @@ Author: pkeffect
 Version: 0.3.0
 """
 import hashlib
+import hmac
+import json
 import logging
+import mmap
 import os
+import queue
 import re
 import sys
+import threading
 import time
-from typing import Dict, Any
-from huggingface_hub import HfApi, hf_hub_download
-from huggingface_hub.utils import HfHubHTTPError
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List
+import httpx
+from huggingface_hub import (
+    HfApi, constants as hf_constants, get_hf_file_metadata, hf_hub_download, hf_hub_url, set_client_factory
+)
+from huggingface_hub.utils import HfHubHTTPError, build_hf_headers, hf_raise_for_status
 from tqdm import tqdm
 
+try:
+    import blake3  # Optional: faster local-only integrity checks
+except ImportError:
+    blake3 = None
+
+try:
+    import h2  # noqa: F401  Optional: lets the shared Hub client negotiate HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    from huggingface_hub.utils._http import hf_request_event_hook
+except ImportError:
+    hf_request_event_hook = None
+
 # Constants
-DEFAULT_CHUNK_SIZE = 8192
+# Large reads let each hashlib update() cover many SHA-256 blocks, so OpenSSL's
+# hardware-accelerated (SHA-NI / ARMv8 SHA2) path dominates over Python overhead
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+# Files above this size are hashed straight out of a read-only memory map
+MMAP_THRESHOLD = 64 * 1024 * 1024
+MMAP_STEP = 64 * 1024 * 1024
+# Streaming download settings (chunks in flight between writer and hasher)
+DOWNLOAD_QUEUE_DEPTH = 16
+DOWNLOAD_TIMEOUT = 30
+# Concurrent file downloads for multi-file (sharded) models
+DOWNLOAD_WORKERS = 8
+# Threads scanning top-level model directories (scandir/stat release the GIL)
+SCAN_WORKERS = min(8, os.cpu_count() or 4)
+
+# HTTP client settings (keep-alive pools for metadata calls and for downloads)
+HTTP_TIMEOUT = httpx.Timeout(10.0, write=60.0)
+HTTP_LIMITS = httpx.Limits(max_connections=2 * DOWNLOAD_WORKERS, max_keepalive_connections=2 * DOWNLOAD_WORKERS)
+
+# Precompiled patterns
+_HF_URL_RE = re.compile(r"huggingface\.co/([^/]+/[^/]+)/blob/main/(.+)")
+_HEX64_RE = re.compile(r'^[a-fA-F0-9]{64}$')
+_WS_SPLIT_RE = re.compile(r'\s+')
+_SHARD_RE = re.compile(r'^(.+)-(\d+)-of-(\d+)\.gguf$')
+# Characters kept from an ETag when naming partial downloads, and the partial-name suffix itself
+_ETAG_NAME_RE = re.compile(r'[^A-Za-z0-9_-]')
+_PARTIAL_SUFFIX_RE = re.compile(r'(?:\.[A-Za-z0-9_-]+)?\.incomplete')
+# Relative .gguf path: no leading '/' or drive letter, no '..' segment anywhere
+_SAFE_GGUF_RELPATH_RE = re.compile(
+    r'(?![A-Za-z]:)(?!/)(?!(?:.*/)?\.\.(?:/|\Z)).*\.gguf\Z',
+    re.IGNORECASE | re.DOTALL
+)
+
+def _build_client(http2: bool) -> httpx.Client:
+    """Builds an httpx.Client with the Hub's request hook and this module's keep-alive pool settings."""
+    return httpx.Client(
+        event_hooks={"request": [hf_request_event_hook]} if hf_request_event_hook else None,
+        follow_redirects=True,
+        timeout=HTTP_TIMEOUT,
+        limits=HTTP_LIMITS,
+        http2=http2
+    )
+
+def _hub_client_factory() -> httpx.Client:
+    """
+    Builds the single httpx.Client huggingface_hub shares across HfApi calls and hf_hub_download.
+    Connections are kept alive between calls, and HTTP/2 is used when the h2 package is installed.
+    """
+    return _build_client(http2=HTTP2_AVAILABLE)
+
+set_client_factory(_hub_client_factory)
+
+# Streaming downloads get their own HTTP/1.1 client: over HTTP/2 every concurrent shard download to the
+# (shared) CDN host would be multiplexed onto one TCP connection, instead of one connection per shard
+_download_client: httpx.Client | None = None
+_download_client_lock = threading.Lock()
+
+def _get_download_client() -> httpx.Client:
+    """Returns the process-wide HTTP/1.1 client used for streaming file downloads."""
+    global _download_client
+    with _download_client_lock:
+        if _download_client is None:
+            _download_client = _build_client(http2=False)
+        return _download_client
 
 def parse_hf_url(url: str) -> tuple[str | None, str | None]:
     """Parses a Hugging Face URL to extract the repository ID and filename."""
-    pattern = r"huggingface\.co/([^/]+/[^/]+)/blob/main/(.+)"
-    match = re.search(pattern, url)
+    match = _HF_URL_RE.search(url)
     if match:
         repo_id = match.group(1)
         filename = match.group(2)
         return repo_id, filename
     return None, None
 
+def get_shard_filenames(filename: str) -> List[str]:
+    """
+    Expands a sharded GGUF filename into the filenames of all its shards.
+    e.g., 'model-00002-of-00003.gguf' -> ['model-00001-of-00003.gguf', ..., 'model-00003-of-00003.gguf']
+    Returns [filename] unchanged for non-sharded files.
+    """
+    match = _SHARD_RE.match(filename)
+    if not match:
+        return [filename]
+    base, index, total = match.groups()
+    width = len(index)
+    return [f"{base}-{i:0{width}d}-of-{total}.gguf" for i in range(1, int(total) + 1)]
+
+def _fadvise(fd: int, advice: str) -> None:
+    """Passes a page-cache access hint (e.g. 'POSIX_FADV_DONTNEED') to the kernel where supported."""
+    if hasattr(os, 'posix_fadvise'):
+        try:
+            os.posix_fadvise(fd, 0, 0, getattr(os, advice))
+        except OSError:
+            pass
+
 def calculate_sha256(filepath: str, chunk_size: int = DEFAULT_CHUNK_SIZE, show_progress: bool = False) -> str:
     """
     Calculate SHA256 hash of a file with optional progress bar.
     
     Args:
         filepath: Path to the file to hash
-        chunk_size: Size of chunks to read (default: 8192 bytes)
+        chunk_size: Size of chunks to read (default: 1 MiB)
         show_progress: Whether to display a progress bar
     
     Returns:
         Hexadecimal SHA256 hash string
     """
-    sha256_hash = hashlib.sha256()
+    # Integrity check only, so skip the FIPS "security" wrapper where present
+    sha256_hash = hashlib.new('sha256', usedforsecurity=False)
     file_size = os.path.getsize(filepath)
     
     with open(filepath, 'rb') as f:
-        if show_progress and file_size > 1024 * 1024:  # Only show for files > 1MB
-            with tqdm(total=file_size, unit='B', unit_scale=True, desc="Hashing") as pbar:
-                for chunk in iter(lambda: f.read(chunk_size), b''):
-                    sha256_hash.update(chunk)
-                    pbar.update(len(chunk))
-        else:
-            for chunk in iter(lambda: f.read(chunk_size), b''):
-                sha256_hash.update(chunk)
+        _fadvise(f.fileno(), 'POSIX_FADV_SEQUENTIAL')
+        try:
+            if not show_progress and hasattr(hashlib, 'file_digest'):
+                # Python 3.11+: the read/update loop runs in C with the GIL released
+                hashlib.file_digest(f, lambda: sha256_hash)
+            elif file_size > MMAP_THRESHOLD:
+                # Hash directly from the page cache, avoiding a copy into Python buffers
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if hasattr(mm, 'madvise'):
+                        mm.madvise(mmap.MADV_SEQUENTIAL)
+                        if hasattr(mmap, 'MADV_WILLNEED'):
+                            mm.madvise(mmap.MADV_WILLNEED)
+                    with memoryview(mm) as view, \
+                            tqdm(total=file_size, unit='B', unit_scale=True, desc="Hashing",
+                                 disable=not show_progress) as pbar:
+                        for offset in range(0, file_size, MMAP_STEP):
+                            with view[offset:offset + MMAP_STEP] as block:
+                                sha256_hash.update(block)
+                                pbar.update(len(block))
+            else:
+                # Reuse one buffer instead of allocating a new bytes object per chunk
+                buffer = bytearray(chunk_size)
+                with memoryview(buffer) as view, \
+                        tqdm(total=file_size, unit='B', unit_scale=True, desc="Hashing",
+                             disable=not (show_progress and file_size > 1024 * 1024)) as pbar:  # Only show for files > 1MB
+                    while (bytes_read := f.readinto(buffer)):
+                        sha256_hash.update(view[:bytes_read])
+                        pbar.update(bytes_read)
+        finally:
+            # Drop the hashed pages so a multi-GB pass does not evict other models from the page cache
+            _fadvise(f.fileno(), 'POSIX_FADV_DONTNEED')
     
     return sha256_hash.hexdigest()
 
-def verify_file_hash(filepath: str, expected_hash: str) -> bool:
-    """Verify that a file's SHA256 hash matches the expected hash."""
-    logging.info(f"Verifying file integrity for {os.path.basename(filepath)}...")
-    actual_hash = calculate_sha256(filepath, show_progress=True)
+def compare_file_hash(filepath: str, actual_hash: str, expected_hash: str) -> bool:
+    """Compare an already computed SHA256 hash of a file against the expected hash."""
+    try:
+        # Decoding the hex makes the comparison case-insensitive; compare_digest is constant-time
+        hashes_match = hmac.compare_digest(bytes.fromhex(actual_hash), bytes.fromhex(expected_hash))
+    except ValueError:
+        hashes_match = False
 
-    if actual_hash.lower() == expected_hash.lower():
+    if hashes_match:
         logging.info("✓ File integrity verified successfully.")
         return True
     else:
@@ -87,6 +223,45 @@ def verify_file_hash(filepath: str, expected_hash: str) -> bool:
         logging.error(f"  Actual:   {actual_hash}")
         return False
 
+def verify_file_hash(filepath: str, expected_hash: str) -> bool:
+    """Verify that a file's SHA256 hash matches the expected hash."""
+    logging.info(f"Verifying file integrity for {os.path.basename(filepath)}...")
+    actual_hash = calculate_sha256(filepath, show_progress=True)
+    return compare_file_hash(filepath, actual_hash, expected_hash)
+
+# BLAKE3 digests computed while streaming downloads, keyed by final path, with the file's (size, mtime_ns);
+# create_hash_file writes the .blake3 sidecar from these instead of re-reading the file
+_STREAMED_BLAKE3: Dict[str, tuple[int, int, str]] = {}
+
+# Repository metadata cache, keyed by repo_id (one repo_info round-trip per repo per process)
+_REPO_INFO_CACHE: Dict[str, Any] = {}
+
+def get_repo_info(api: HfApi, repo_id: str) -> Any:
+    """Fetches repo metadata including per-file LFS info, cached per repo_id for the process lifetime."""
+    repo_info = _REPO_INFO_CACHE.get(repo_id)
+    if repo_info is None:
+        repo_info = api.repo_info(repo_id=repo_id, files_metadata=True)
+        _REPO_INFO_CACHE[repo_id] = repo_info
+    return repo_info
+
+def get_remote_lfs_hash_from_info(repo_info: Any, filename: str) -> str | None:
+    """
+    Returns the LFS SHA256 hash for the specified file from already fetched repo metadata.
+    Returns None if hash cannot be retrieved.
+    """
+    for file_meta in repo_info.siblings:
+        if file_meta.rfilename == filename:
+            if file_meta.lfs and file_meta.lfs.get("sha256"):
+                sha256_hash = file_meta.lfs["sha256"]
+                logging.info(f"✓ Retrieved remote SHA256 hash.")
+                return sha256_hash
+            else:
+                logging.warning(f"File metadata found for {filename} but no LFS SHA256 hash available.")
+                return None
+
+    logging.warning(f"File '{filename}' not found in repository metadata for {repo_info.id}.")
+    return None
+
 def get_remote_lfs_hash(api: HfApi, repo_id: str, filename: str) -> str | None:
     """
     Fetches repo metadata and returns the LFS SHA256 hash for the specified file.
@@ -94,27 +269,22 @@ def get_remote_lfs_hash(api: HfApi, repo_id: str, filename: str) -> str | None:
     """
     logging.info(f"Fetching remote hash for {filename} from {repo_id}...")
     try:
-        repo_info = api.repo_info(repo_id=repo_id, files_metadata=True)
-
-        for file_meta in repo_info.siblings:
-            if file_meta.rfilename == filename:
-                if file_meta.lfs and file_meta.lfs.get("sha256"):
-                    sha256_hash = file_meta.lfs["sha256"]
-                    logging.info(f"✓ Retrieved remote SHA256 hash.")
-                    return sha256_hash
-                else:
-                    logging.warning(f"File metadata found for {filename} but no LFS SHA256 hash available.")
-                    return None
-
-        logging.warning(f"File '{filename}' not found in repository metadata for {repo_id}.")
-        return None
-
+        return get_remote_lfs_hash_from_info(get_repo_info(api, repo_id), filename)
     except Exception as e:
         logging.error(f"Failed to retrieve repository metadata for {repo_id}: {e}")
         return None
 
+def calculate_blake3(filepath: str) -> str:
+    """Calculate the BLAKE3 hash of a file using all available cores (requires the blake3 package)."""
+    return blake3.blake3(max_threads=blake3.blake3.AUTO).update_mmap(filepath).hexdigest()
+
 def create_hash_file(filepath: str, sha256_hash: str) -> None:
-    """Creates a .sha256 file in the format compatible with sha256sum."""
+    """
+    Creates a .sha256 file in the format compatible with sha256sum, plus a .sha256.meta
+    cache of the file's size and mtime. If the file was just downloaded with the blake3 package available,
+    also writes the BLAKE3 digest computed during the download as a .blake3 sidecar (b3sum format)
+    used for fast local re-verification; the file itself is never read again here.
+    """
     hash_filepath = f"{filepath}.sha256"
     filename = os.path.basename(filepath)
 
@@ -124,13 +294,31 @@ def create_hash_file(filepath: str, sha256_hash: str) -> None:
         logging.info(f"✓ Created/Updated hash file: {os.path.basename(hash_filepath)}")
     except OSError as e:
         logging.error(f"Failed to create hash file: {e}")
+        return
+    _write_hash_meta(filepath, sha256_hash)
 
-def read_hash_file(filepath: str) -> str | None:
+    blake3_filepath = f"{filepath}.blake3"
+    streamed = _STREAMED_BLAKE3.pop(filepath, None)
+    try:
+        st = os.stat(filepath)
+        if streamed is not None and streamed[:2] == (st.st_size, st.st_mtime_ns):
+            with open(blake3_filepath, 'w') as f:
+                f.write(f"{streamed[2]}  {filename}\n")
+            logging.info(f"✓ Created/Updated hash file: {os.path.basename(blake3_filepath)}")
+        else:
+            # No digest for this version of the file; a sidecar left from an older one would fail verification
+            os.remove(blake3_filepath)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logging.error(f"Failed to create BLAKE3 hash file: {e}")
+
+def read_hash_file(filepath: str, extension: str = '.sha256') -> str | None:
     """
-    Reads a .sha256 file and extracts the hash value.
+    Reads a .sha256 (or other checksum-format, e.g. .blake3) file and extracts the hash value.
     Returns None if file doesn't exist or is malformed.
     """
-    hash_filepath = f"{filepath}.sha256"
+    hash_filepath = f"{filepath}{extension}"
     
     if not os.path.exists(hash_filepath):
         return None
@@ -139,10 +327,10 @@ def read_hash_file(filepath: str) -> str | None:
         with open(hash_filepath, 'r') as f:
             content = f.read().strip()
             # Format is: "hash  filename" or "hash *filename"
-            parts = re.split(r'\s+', content, maxsplit=1)
+            parts = _WS_SPLIT_RE.split(content, maxsplit=1)
             if parts and len(parts[0]) == 64:
                 # Validate it's actually hexadecimal
-                if re.match(r'^[a-fA-F0-9]{64}$', parts[0]):
+                if _HEX64_RE.match(parts[0]):
                     return parts[0]
             logging.warning(f"Malformed hash file: {os.path.basename(hash_filepath)}")
             return None
@@ -150,19 +338,82 @@ def read_hash_file(filepath: str) -> str | None:
         logging.error(f"Failed to read hash file {os.path.basename(hash_filepath)}: {e}")
         return None
 
+def _write_hash_meta(filepath: str, sha256_hash: str, st: os.stat_result | None = None) -> None:
+    """
+    Records the size and mtime of a verified file in a .sha256.meta JSON sidecar,
+    so later integrity checks can skip re-hashing an unchanged file.
+    """
+    meta_filepath = f"{filepath}.sha256.meta"
+    try:
+        st = st or os.stat(filepath)
+        with open(meta_filepath, 'w') as f:
+            json.dump({'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': sha256_hash.lower()}, f)
+    except OSError as e:
+        logging.debug(f"Failed to write hash metadata {os.path.basename(meta_filepath)}: {e}")
+
+def _hash_meta_matches(filepath: str, sha256_hash: str, st: os.stat_result) -> bool:
+    """Returns True if the .sha256.meta sidecar shows the file unchanged since it was last verified."""
+    try:
+        with open(f"{filepath}.sha256.meta", 'r') as f:
+            meta = json.load(f)
+        return (meta.get('size') == st.st_size and meta.get('mtime_ns') == st.st_mtime_ns
+                and meta.get('sha256') == sha256_hash.lower())
+    except (OSError, ValueError, AttributeError):
+        return False
+
+def _remove_hash_meta(filepath: str) -> None:
+    """Invalidates the cached verification result for a file."""
+    try:
+        os.remove(f"{filepath}.sha256.meta")
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logging.debug(f"Failed to remove hash metadata for {os.path.basename(filepath)}: {e}")
+
 def verify_local_file_integrity(filepath: str) -> bool:
     """
     Verifies a local file against its accompanying .sha256 file if it exists.
+    A .blake3 sidecar is preferred when present and the blake3 package is installed.
+    Files whose size and mtime match the .sha256.meta cache from the last successful
+    verification are not re-hashed.
     Returns True if verified or if no hash file exists (no verification needed).
     Returns False only if hash file exists but verification fails.
     """
     expected_hash = read_hash_file(filepath)
-    
-    if expected_hash is None:
-        logging.info(f"No hash file found for {os.path.basename(filepath)}, skipping verification.")
-        return True
-    
-    return verify_file_hash(filepath, expected_hash)
+    st = None
+    if expected_hash is not None:
+        # Only stat once there is something to verify against, so a missing file without a hash file stays a no-op
+        try:
+            st = os.stat(filepath)
+        except OSError as e:
+            logging.error(f"Cannot verify {os.path.basename(filepath)}: {e}")
+            return False
+        if _hash_meta_matches(filepath, expected_hash, st):
+            logging.info(f"✓ {os.path.basename(filepath)} unchanged since last verification, skipping re-hash.")
+            return True
+
+    verified = None
+    if blake3 is not None:
+        expected_blake3 = read_hash_file(filepath, '.blake3')
+        if expected_blake3 is not None:
+            logging.info(f"Verifying file integrity for {os.path.basename(filepath)} (BLAKE3)...")
+            try:
+                verified = compare_file_hash(filepath, calculate_blake3(filepath), expected_blake3)
+            except OSError as e:
+                logging.error(f"Cannot verify {os.path.basename(filepath)}: {e}")
+                return False
+
+    if verified is None:
+        if expected_hash is None:
+            logging.info(f"No hash file found for {os.path.basename(filepath)}, skipping verification.")
+            return True
+        verified = verify_file_hash(filepath, expected_hash)
+
+    if not verified:
+        _remove_hash_meta(filepath)
+    elif expected_hash is not None:
+        _write_hash_meta(filepath, expected_hash, st)
+    return verified
 
 def download_with_progress(repo_id: str, filename: str, dest_path: str, retries: int, retry_delay: int) -> str | None:
     """
@@ -213,6 +464,259 @@ def download_with_progress(repo_id: str, filename: str, dest_path: str, retries:
 
     return None
 
+def _hash_worker(chunks: queue.Queue, hashers: List[Any], prefix_path: str | None, prefix_size: int,
+                 errors: list) -> None:
+    """Feeds downloaded chunks from the queue to every hasher until a None sentinel arrives."""
+    try:
+        if prefix_path and prefix_size:
+            # Resumed download: hash the bytes already on disk first
+            with open(prefix_path, 'rb') as f:
+                remaining = prefix_size
+                while remaining > 0:
+                    chunk = f.read(min(DEFAULT_CHUNK_SIZE, remaining))
+                    if not chunk:
+                        raise OSError(f"Partial file shrank while hashing: {prefix_path}")
+                    for hasher in hashers:
+                        hasher.update(chunk)
+                    remaining -= len(chunk)
+    except Exception as e:
+        errors.append(e)
+    # Always drain the queue so the writer never blocks on a full queue
+    while (chunk := chunks.get()) is not None:
+        if not errors:
+            for hasher in hashers:
+                hasher.update(chunk)
+
+def _stream_to_file(url: str, filename: str, partial_path: str,
+                    position: int | None = None) -> tuple[str, str | None]:
+    """
+    Streams a URL into partial_path (resuming if it exists) and returns the SHA256 of the full file,
+    plus its BLAKE3 when the blake3 package is installed (else None).
+    A position pins the progress bar to that terminal line and clears it when done (for concurrent downloads).
+    """
+    resume_from = os.path.getsize(partial_path) if os.path.exists(partial_path) else 0
+    headers = build_hf_headers()
+    # GGUF weights don't compress; asking for identity lets the body be written without a decode pass
+    headers['Accept-Encoding'] = 'identity'
+    if resume_from:
+        headers['Range'] = f"bytes={resume_from}-"
+
+    with _get_download_client().stream('GET', url, headers=headers, follow_redirects=True,
+                                        timeout=DOWNLOAD_TIMEOUT) as response:
+        if resume_from and response.status_code == 416:
+            # Range not satisfiable: the partial file is stale, start over
+            os.remove(partial_path)
+            raise OSError(f"Could not resume partial download of '{filename}'.")
+        hf_raise_for_status(response)
+        if response.status_code != 206:
+            resume_from = 0  # Server ignored the Range header
+
+        total = int(response.headers.get('Content-Length', 0)) + resume_from
+        if response.headers.get('Content-Encoding', 'identity') == 'identity':
+            body = response.iter_raw(DEFAULT_CHUNK_SIZE)
+        else:
+            body = response.iter_bytes(DEFAULT_CHUNK_SIZE)
+        sha256_hash = hashlib.new('sha256', usedforsecurity=False)
+        blake3_hash = blake3.blake3() if blake3 is not None else None
+        hashers = [sha256_hash] if blake3_hash is None else [sha256_hash, blake3_hash]
+        chunks: queue.Queue = queue.Queue(maxsize=DOWNLOAD_QUEUE_DEPTH)
+        errors: list = []
+        hasher = threading.Thread(
+            target=_hash_worker,
+            args=(chunks, hashers, partial_path, resume_from, errors),
+            daemon=True
+        )
+        hasher.start()
+        try:
+            with open(partial_path, 'ab' if resume_from else 'wb') as f, \
+                    tqdm(total=total or None, initial=resume_from, unit='B', unit_scale=True,
+                         desc=os.path.basename(filename), position=position,
+                         leave=position is None) as pbar:
+                for chunk in body:
+                    f.write(chunk)
+                    chunks.put(chunk)
+                    pbar.update(len(chunk))
+                f.flush()
+                _fadvise(f.fileno(), 'POSIX_FADV_DONTNEED')
+        finally:
+            chunks.put(None)
+            hasher.join()
+
+    if errors:
+        raise errors[0]
+    return sha256_hash.hexdigest(), blake3_hash.hexdigest() if blake3_hash is not None else None
+
+def _existing_file_hash(final_path: str, st: os.stat_result) -> str | None:
+    """
+    Returns the SHA256 of an existing file, from its .sha256/.sha256.meta sidecars when they are current.
+    Returns None if the file can't be read, so it is downloaded again.
+    """
+    recorded_hash = read_hash_file(final_path)
+    if recorded_hash is not None and _hash_meta_matches(final_path, recorded_hash, st):
+        return recorded_hash
+    logging.info(f"Hashing existing file {os.path.basename(final_path)}...")
+    try:
+        return calculate_sha256(final_path, show_progress=True)
+    except OSError as e:
+        logging.warning(f"Could not read existing file {final_path} ({e}); downloading it again.")
+        return None
+
+def _fetch_file_metadata(url: str) -> tuple[Any | None, Exception | None]:
+    """
+    Fetches the remote file's metadata (size, ETag). Returns (metadata, None) on success, (None, None) on an
+    HTTP error, which the download attempt then reports, and (None, error) if the Hub can't be reached.
+    """
+    try:
+        return get_hf_file_metadata(url, timeout=DOWNLOAD_TIMEOUT), None
+    except HfHubHTTPError:
+        return None, None
+    except (httpx.TransportError, OSError) as e:
+        return None, e
+
+def _current_local_hash(final_path: str, metadata: Any | None, hub_error: Exception | None) -> str | None:
+    """
+    Returns the SHA256 of final_path if the file already matches the remote one, so the download can be skipped.
+    Like hf_hub_download, an existing file is used as is in offline mode (HF_HUB_OFFLINE) or when the Hub
+    can't be reached (hub_error). Returns None if the file has to be downloaded.
+    """
+    try:
+        st = os.stat(final_path)
+    except OSError:
+        return None
+
+    if hf_constants.HF_HUB_OFFLINE:
+        logging.warning(f"Offline mode: using existing file {final_path} without checking for a newer version.")
+        return _existing_file_hash(final_path, st)
+    if hub_error is not None:
+        logging.warning(f"Could not reach the Hub ({hub_error}); using existing file {final_path}.")
+        return _existing_file_hash(final_path, st)
+    if metadata is None:
+        return None
+
+    # LFS files (all GGUF weights) carry their SHA256 as the ETag; anything else is simply re-downloaded
+    remote_hash = (metadata.etag or '').lower()
+    if (metadata.size is not None and metadata.size != st.st_size) or not _HEX64_RE.match(remote_hash):
+        return None
+    local_hash = _existing_file_hash(final_path, st)
+    return local_hash if local_hash is not None and local_hash.lower() == remote_hash else None
+
+def _partial_path(final_path: str, etag: str | None) -> str:
+    """
+    Names the partial download after the remote ETag, as hf_hub_download does, so bytes of one version
+    of a file are never resumed against another.
+    """
+    tag = _ETAG_NAME_RE.sub('', etag or '')
+    return f"{final_path}.{tag}.incomplete" if tag else f"{final_path}.incomplete"
+
+def _remove_stale_partials(final_path: str, keep_path: str | None) -> None:
+    """Deletes partial downloads of final_path other than keep_path (other versions, or of unknown version)."""
+    directory, name = os.path.split(final_path)
+    keep_name = os.path.basename(keep_path) if keep_path else None
+    try:
+        with os.scandir(directory or '.') as entries:
+            stale = [e.path for e in entries
+                     if e.name.startswith(name) and e.name != keep_name
+                     and _PARTIAL_SUFFIX_RE.fullmatch(e.name, len(name))]
+    except OSError:
+        return
+    for path in stale:
+        try:
+            os.remove(path)
+            logging.info(f"Removed stale partial download: {os.path.basename(path)}")
+        except OSError as e:
+            logging.debug(f"Failed to remove stale partial download {path}: {e}")
+
+def download_with_hash(repo_id: str, filename: str, dest_path: str, retries: int,
+                       retry_delay: int, progress_position: int | None = None) -> tuple[str | None, str | None]:
+    """
+    Download a file from Hugging Face Hub, hashing it while it is written to disk.
+    An existing file that already matches the remote size and SHA256 (ETag) is not downloaded again.
+    Interrupted downloads resume from the partial file on the next attempt.
+    progress_position is passed to the progress bar (see _stream_to_file).
+    Returns (path, sha256) on success, (None, None) on failure.
+    """
+    url = hf_hub_url(repo_id=repo_id, filename=filename)
+    final_path = os.path.join(dest_path, *filename.split('/'))
+
+    metadata, hub_error = (None, None) if hf_constants.HF_HUB_OFFLINE else _fetch_file_metadata(url)
+    local_hash = _current_local_hash(final_path, metadata, hub_error)
+    if local_hash is not None:
+        logging.info(f"✓ Reusing existing file: {final_path}")
+        return final_path, local_hash
+    if hf_constants.HF_HUB_OFFLINE:
+        logging.error(f"Offline mode is enabled (HF_HUB_OFFLINE) and '{filename}' is not available locally.")
+        return None, None
+
+    # Only a partial of the current remote version may be resumed; without an ETag, none can be trusted
+    etag = metadata.etag if metadata is not None else None
+    partial_path = _partial_path(final_path, etag)
+    _remove_stale_partials(final_path, partial_path if etag else None)
+    remote_hash = (etag or '').lower()
+    if not _HEX64_RE.match(remote_hash):
+        remote_hash = None
+
+    for attempt in range(retries):
+        try:
+            logging.info(f"\nDownloading '{filename}' (Attempt {attempt + 1}/{retries})...")
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+
+            actual_hash, blake3_digest = _stream_to_file(url, filename, partial_path, progress_position)
+            if remote_hash is not None and actual_hash != remote_hash:
+                # Never let corrupt data replace the (possibly good) existing file
+                os.remove(partial_path)
+                raise OSError(f"Downloaded data for '{filename}' does not match the remote SHA256; discarded it.")
+            os.replace(partial_path, final_path)
+            if blake3_digest is not None:
+                st = os.stat(final_path)
+                _STREAMED_BLAKE3[final_path] = (st.st_size, st.st_mtime_ns, blake3_digest)
+
+            logging.info(f"✓ Successfully downloaded to: {final_path}")
+            return final_path, actual_hash
+
+        except HfHubHTTPError as e:
+            logging.error(f"HTTP error during download attempt {attempt + 1}: {e}")
+            if attempt + 1 < retries:
+                delay = retry_delay * (2 ** attempt)
+                logging.info(f"Retrying in {delay} seconds...")
+                time.sleep(delay)
+            else:
+                logging.error("All download attempts failed due to HTTP errors.")
+
+        except Exception as e:
+            logging.error(f"Error during download attempt {attempt + 1}: {e}")
+            if attempt + 1 < retries:
+                delay = retry_delay * (2 ** attempt)
+                logging.info(f"Retrying in {delay} seconds...")
+                time.sleep(delay)
+            else:
+                logging.error("All download attempts failed.")
+
+    return None, None
+
+def download_many(repo_id: str, filenames: List[str], dest_path: str, retries: int, retry_delay: int,
+                  max_workers: int = DOWNLOAD_WORKERS) -> Dict[str, tuple[str | None, str | None]]:
+    """
+    Download several files from one repository concurrently, each with download_with_hash's retry logic,
+    so every file is hashed as it is written. Each worker draws its progress bar on its own terminal line.
+    Returns a dictionary mapping each filename to its (path, sha256), or (None, None) if that download failed.
+    """
+    workers = min(max_workers, len(filenames)) or 1
+    # Free progress-bar lines; a download holds one for its lifetime so concurrent bars never overlap
+    positions: queue.Queue = queue.Queue()
+    for position in range(workers):
+        positions.put(position)
+
+    def download_one(filename: str) -> tuple[str | None, str | None]:
+        position = positions.get()
+        try:
+            return download_with_hash(repo_id, filename, dest_path, retries, retry_delay, position)
+        finally:
+            positions.put(position)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {filename: executor.submit(download_one, filename) for filename in filenames}
+        return {filename: future.result() for filename, future in futures.items()}
+
 def get_model_destination_path(models_base_dir: str, repo_id: str) -> str:
     """
     Constructs the destination path for a model based on repository structure.
@@ -220,6 +724,26 @@ def get_model_destination_path(models_base_dir: str, repo_id: str) -> str:
     """
     return os.path.join(models_base_dir, *repo_id.split('/'))
 
+def _iter_gguf_files(directory: str, prefix: str = '') -> Iterator[str]:
+    """
+    Yields POSIX-style paths (relative to the scan root) of .gguf files below directory.
+    Uses os.scandir so file types come from the cached directory entry instead of a stat per file.
+    Symlinked directories are not followed and unreadable directories are skipped, as with os.walk.
+    """
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from _iter_gguf_files(entry.path, f"{prefix}{entry.name}/")
+                elif entry.name.endswith('.gguf'):
+                    yield prefix + entry.name
+    except OSError as e:
+        logging.debug(f"Skipping unreadable directory '{directory}': {e}")
+
+def _scan_subtree(entry: os.DirEntry) -> List[str]:
+    """Collects the .gguf paths below one top-level directory, relative to the models root."""
+    return list(_iter_gguf_files(entry.path, f"{entry.name}/"))
+
 def list_local_gguf_files(models_dir: str) -> Dict[str, str]:
     """
     Recursively scans models directory for .gguf files.
@@ -234,16 +758,32 @@ def list_local_gguf_files(models_dir: str) -> Dict[str, str]:
         logging.warning(f"Models directory '{models_dir}' not found.")
         return model_paths
     
-    for root, _, files in os.walk(models_dir):
-        for file in files:
-            if file.endswith('.gguf'):
-                full_path = os.path.join(root, file)
-                relative_path = os.path.relpath(full_path, models_dir)
-                # Normalize to POSIX-style paths
-                path_posix = relative_path.replace(os.path.sep, '/')
-                # Create key by replacing / with --
-                model_key = path_posix.replace('.gguf', '').replace('/', '--')
-                model_paths[model_key] = path_posix
+    # Split off the top level so each subtree (usually one per author) can scan in its own thread;
+    # directory reads then overlap, which matters on cold caches and network mounts
+    paths: List[str] = []
+    subdirs: List[os.DirEntry] = []
+    try:
+        with os.scandir(models_dir) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry)
+                elif entry.name.endswith('.gguf'):
+                    paths.append(entry.name)
+    except OSError as e:
+        logging.debug(f"Skipping unreadable directory '{models_dir}': {e}")
+
+    if len(subdirs) > 1:
+        with ThreadPoolExecutor(max_workers=min(SCAN_WORKERS, len(subdirs))) as executor:
+            for subtree in executor.map(_scan_subtree, subdirs):
+                paths.extend(subtree)
+    else:
+        for entry in subdirs:
+            paths.extend(_scan_subtree(entry))
+
+    for path_posix in paths:
+        # Create key by removing '.gguf' and replacing / with -- (must match llama_swap_sync's key derivation)
+        model_key = path_posix.replace('.gguf', '').replace('/', '--')
+        model_paths[model_key] = path_posix
     
     return model_paths
 
@@ -252,17 +792,5 @@ def validate_gguf_filepath(filepath: str) -> bool:
     Validate that a relative filepath is safe and is a GGUF file.
     Prevents path traversal and ensures proper format.
     """
-    if not filepath:
-        return False
-    
-    # Normalize and check for path traversal
-    normalized = filepath.replace('\\', '/')
-    if '..' in normalized.split('/'):
-        return False
-    
-    # Disallow absolute paths
-    if os.path.isabs(filepath):
-        return False
-    
-    # Ensure it's a gguf file
-    return filepath.lower().endswith('.gguf')
+    # Single regex pass over the POSIX-normalized path (see _SAFE_GGUF_RELPATH_RE)
+    return bool(_SAFE_GGUF_RELPATH_RE.match(filepath.replace('\\', '/')))
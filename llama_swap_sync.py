@@ -18,24 +18,44 @@ Version: 0.6.0
 """
 import argparse
 import copy
-import datetime
-import glob
+import functools
 import hashlib
+import heapq
 import logging
+import mmap
 import os
 import shutil
-import subprocess
+import stat
 import sys
-from typing import Dict, Any, Tuple
+import tempfile
+import time
+from collections import Counter
+from typing import Dict, Any, List, Optional, Set, Tuple
 
 import yaml
 
-from hf_utils import list_local_gguf_files, validate_gguf_filepath
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Prefer the libyaml-backed C loader/dumper; fall back to pure Python when PyYAML lacks libyaml
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+    LIBYAML_AVAILABLE = True
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+    LIBYAML_AVAILABLE = False
+
+VERSION = '0.6.0'
 
 # --- CONFIGURATION (Defaults - Override via CLI args or environment variables) ---
 MODELS_DIR = './models'
 CONFIG_FILE_PATH = './config.yaml'
 DOCKER_CONTAINER_NAME = 'llama-swap'
+DOCKER_SOCKET = '/var/run/docker.sock'
+DOCKER_RESTART_TIMEOUT = 60
 
 # Configurable via environment variables
 MAX_BACKUPS = int(os.getenv('LLAMA_SWAP_MAX_BACKUPS', '3'))
@@ -44,19 +64,57 @@ MAX_KEY_LENGTH = int(os.getenv('LLAMA_SWAP_MAX_KEY_LENGTH', '80'))
 # YAML width for optimal formatting (prevents very long single lines while maintaining readability)
 YAML_WIDTH = 120
 
+# Default llama-server command for new entries; {model_filename} is the path relative to /models
+CMD_TEMPLATE = (
+    "/app/llama-server\n"
+    "  -m /models/{model_filename}\n"
+    "  -ngl 99\n"
+    "  -c 4096\n"
+    "  -b 2048\n"
+    "  -ub 512\n"
+    "  --temp 0.7\n"
+    "  --top-p 0.95\n"
+    "  --top-k 40\n"
+    "  --repeat-penalty 1.1\n"
+    "  --port ${PORT}\n"
+    "  --host 0.0.0.0"
+)
+# Split once so each entry is built by plain concatenation instead of str.format
+_CMD_PREFIX, _, _CMD_SUFFIX = CMD_TEMPLATE.partition('{model_filename}')
+
+# Buffer size for reading/writing the config file (fewer read()/write() syscalls on large configs)
+YAML_IO_BUFFER = 1024 * 1024
+
 # --- CROSS-PLATFORM SYMBOLS ---
 CHECK_MARK = "✓" if sys.platform != "win32" else "[OK]"
 CROSS_MARK = "✗" if sys.platform != "win32" else "[X]"
 
 # --- PyYAML Customization for pretty multiline strings ---
+# save_config wraps every model's 'cmd' in this to force '|' style; other strings keep PyYAML's default style
 class LiteralString(str): pass
 
 def literal_representer(dumper, data) -> yaml.ScalarNode:
     """Instructs PyYAML to dump a string as a literal block scalar (using '|')."""
-    return dumper.represent_scalar('tag:yaml.org,2002:str', data, style='|')
+    # The C emitter only accepts exact str values, not subclasses
+    return dumper.represent_scalar('tag:yaml.org,2002:str', str(data), style='|')
+
+class _Dumper(SafeDumper):
+    """SafeDumper carrying this module's representers, so the shared yaml.SafeDumper is left untouched."""
+
+_Dumper.add_representer(LiteralString, literal_representer)
+
+def _key_from_path(filepath_posix: str) -> str:
+    """Derives the (unshortened) model key from a POSIX relative path ending in '.gguf'."""
+    # Every '.gguf' is removed, not just the suffix: keys in existing configs were derived this way,
+    # and a different key for e.g. 'foo.gguf.bak/x.gguf' would turn those entries stale (and --prune them)
+    return filepath_posix.replace('.gguf', '').replace('/', '--')
 
-yaml.add_representer(LiteralString, literal_representer, Dumper=yaml.SafeDumper)
+def _path_from_key(model_key: str) -> str:
+    """Reconstructs the relative .gguf path a model key was derived from."""
+    return model_key.replace('--', '/') + '.gguf'
 
+# Pure function of the path (MAX_KEY_LENGTH is fixed at import), so results can be reused
+@functools.lru_cache(maxsize=4096)
 def create_safe_model_key(filepath: str) -> str:
     """
     Creates a safe, shortened YAML key from filepath.
@@ -67,7 +125,7 @@ def create_safe_model_key(filepath: str) -> str:
     filepath_posix = filepath.replace(os.path.sep, '/')
     
     # Create base key
-    base_key = filepath_posix.replace('.gguf', '').replace('/', '--')
+    base_key = _key_from_path(filepath_posix)
     
     # If key is too long, create a shortened version
     if len(base_key) > MAX_KEY_LENGTH:
@@ -96,35 +154,24 @@ def create_safe_model_key(filepath: str) -> str:
     
     return base_key
 
-def create_model_entry(filepath: str) -> Dict[str, Any]:
-    """Creates a comprehensive, scaffolded dictionary for a model entry from its relative path."""
+def create_model_entry(filepath: str, model_key: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Creates a comprehensive, scaffolded dictionary for a model entry from its relative path.
+    Callers that already know the unshortened model key can pass it to skip re-deriving it.
+    """
     # Normalize filepath to use forward slashes for consistency
     filepath_posix = filepath.replace(os.path.sep, '/')
     
     # Create a prettier name for display purposes
-    model_key = filepath_posix.replace('.gguf', '').replace('/', '--')
+    if model_key is None:
+        model_key = _key_from_path(filepath_posix)
+    # Chained replace() beats str.translate() here: translate() has no fast path for short ASCII keys
     pretty_name = model_key.replace('--', ' / ').replace('-', ' ').replace('_', ' ')
     
-    # Dynamic command generation
-    cmd_string = (
-        "/app/llama-server\n"
-        f"  -m /models/{filepath_posix}\n"
-        "  -ngl 99\n"
-        "  -c 4096\n"
-        "  -b 2048\n"
-        "  -ub 512\n"
-        "  --temp 0.7\n"
-        "  --top-p 0.95\n"
-        "  --top-k 40\n"
-        "  --repeat-penalty 1.1\n"
-        "  --port ${PORT}\n"
-        "  --host 0.0.0.0"
-    )
-
     entry: Dict[str, Any] = {
         'name': pretty_name,
         'description': f"Auto-generated entry for {filepath_posix}",
-        'cmd': LiteralString(cmd_string),
+        'cmd': _CMD_PREFIX + filepath_posix + _CMD_SUFFIX,
         'aliases': [],
         'env': [],
         'ttl': 0,
@@ -137,6 +184,20 @@ def create_model_entry(filepath: str) -> Dict[str, Any]:
     }
     return entry
 
+# Path-dependent keys; only these need a full create_model_entry() when missing
+_PATH_DERIVED_KEYS = ('name', 'description', 'cmd')
+# Static defaults for every other key, probed once at import time
+_DEFAULT_KEYS_AND_VALUES = [
+    (k, v) for k, v in create_model_entry('__probe__.gguf').items() if k not in _PATH_DERIVED_KEYS
+]
+# Every key a complete entry has; the audit diffs each entry against it
+_TEMPLATE_KEYSET = frozenset(_PATH_DERIVED_KEYS).union(k for k, _ in _DEFAULT_KEYS_AND_VALUES)
+# Everything besides the files themselves that changes what a sync produces; part of the sync stamp,
+# so an upgrade or a new LLAMA_SWAP_MAX_KEY_LENGTH forces a full run
+_SETTINGS_FINGERPRINT = hashlib.sha256(
+    repr((VERSION, MAX_KEY_LENGTH, sorted(_TEMPLATE_KEYSET), CMD_TEMPLATE)).encode()
+).hexdigest()[:16]
+
 def manage_backups(config_path: str, dry_run: bool) -> None:
     """Creates a new timestamped backup and prunes old ones, respecting MAX_BACKUPS."""
     logging.info("--- Managing Backups ---")
@@ -144,11 +205,27 @@ def manage_backups(config_path: str, dry_run: bool) -> None:
         logging.info("Config file '%s' does not exist. Skipping backup.", config_path)
         return
 
-    backup_pattern = f"{config_path}.bak.*"
-    existing_backups = sorted(glob.glob(backup_pattern))
-
-    while len(existing_backups) >= MAX_BACKUPS:
-        oldest_backup = existing_backups.pop(0)
+    # Plain prefix match over one directory listing; avoids glob's fnmatch regex and extra stats
+    prefix = os.path.basename(config_path) + '.bak.'
+    dirpath = os.path.dirname(config_path)
+    with os.scandir(dirpath or '.') as it:
+        existing_backups = [
+            os.path.join(dirpath, e.name) for e in it
+            if e.name.startswith(prefix) and e.is_file(follow_symlinks=False)
+        ]
+
+    # Backups keep the source's mtime (copy2), so a matching size and mtime means nothing changed
+    if existing_backups:
+        newest_backup = max(existing_backups)
+        src_st = os.stat(config_path)
+        bak_st = os.stat(newest_backup)
+        if src_st.st_size == bak_st.st_size and src_st.st_mtime_ns == bak_st.st_mtime_ns:
+            logging.info("Config unchanged since last backup '%s'. Skipping backup.", newest_backup)
+            return
+
+    # Timestamped names order chronologically; select only the ones to drop instead of sorting them all
+    excess = len(existing_backups) - MAX_BACKUPS + 1
+    for oldest_backup in heapq.nsmallest(excess, existing_backups):
         if dry_run:
             logging.info("DRY RUN: Would remove oldest backup: %s", oldest_backup)
         else:
@@ -158,7 +235,7 @@ def manage_backups(config_path: str, dry_run: bool) -> None:
             except OSError as e:
                 logging.error("Failed to remove backup '%s': %s", oldest_backup, e)
     
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
     new_backup_path = f"{config_path}.bak.{timestamp}"
     if dry_run:
         logging.info("DRY RUN: Would create backup: %s", new_backup_path)
@@ -172,8 +249,9 @@ def manage_backups(config_path: str, dry_run: bool) -> None:
 def load_config(config_path: str) -> Dict[str, Any]:
     """Loads and parses the YAML config file, handling errors gracefully."""
     try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f)
+        # Binary stream: the loader reads and decodes (UTF-8) in chunks rather than via a full str
+        with open(config_path, 'rb', buffering=YAML_IO_BUFFER) as f:
+            data = yaml.load(f, Loader=SafeLoader)
             if data is None or not isinstance(data, dict):
                 logging.warning("Config file is empty or invalid. Starting with default structure.")
                 return {'models': {}}
@@ -193,86 +271,86 @@ def load_config(config_path: str) -> Dict[str, Any]:
         logging.critical("Permission denied when trying to read config file '%s'.", config_path)
         sys.exit(1)
 
-def audit_config_entries(config_models: Dict[str, Any]) -> int:
-    """Audits existing entries, preserving manual changes by adding missing keys."""
+def audit_config_entries(config_models: Dict[str, Any]) -> Set[str]:
+    """Audits existing entries, preserving manual changes by adding missing keys. Returns updated keys."""
     logging.info("--- Auditing Existing Config Entries for Completeness ---")
-    models_updated = 0
-    template_keys = set(create_model_entry("dummy/dummy.gguf").keys())
-    
-    for model_key, existing_entry in list(config_models.items()):
+    models_updated: Set[str] = set()
+
+    # Iterate the live view: the loop only rebinds existing keys, never adds or deletes, so the size is stable
+    for model_key, existing_entry in config_models.items():
         if not isinstance(existing_entry, dict):
             logging.warning("Found malformed entry for '%s' (not a dictionary). Forcibly reformatting.", model_key)
-            reconstructed_filepath = model_key.replace('--', '/') + '.gguf'
-            config_models[model_key] = create_model_entry(reconstructed_filepath)
-            models_updated += 1
+            config_models[model_key] = create_model_entry(_path_from_key(model_key), model_key)
+            models_updated.add(model_key)
             continue
 
-        missing_keys = template_keys - set(existing_entry.keys())
-        if missing_keys:
-            reconstructed_filepath = model_key.replace('--', '/') + '.gguf'
-            ideal_template = create_model_entry(reconstructed_filepath)
-            for key in missing_keys:
-                existing_entry[key] = ideal_template[key]
-            logging.info("UPDATING: Entry '%s' was missing keys: %s", model_key, sorted(list(missing_keys)))
-            models_updated += 1
+        # Passing the dict itself lets difference() probe it per template key without building a keys() set
+        missing_keys = _TEMPLATE_KEYSET.difference(existing_entry)
+        if not missing_keys:
+            continue
 
-    if models_updated == 0:
+        for key, default in _DEFAULT_KEYS_AND_VALUES:
+            if key in missing_keys:
+                # Copy so entries never share the probe's list/dict instances
+                existing_entry[key] = copy.copy(default)
+        if not missing_keys.isdisjoint(_PATH_DERIVED_KEYS):
+            ideal_template = create_model_entry(_path_from_key(model_key), model_key)
+            for key in _PATH_DERIVED_KEYS:
+                if key in missing_keys:
+                    existing_entry[key] = ideal_template[key]
+        logging.info("UPDATING: Entry '%s' was missing keys: %s", model_key, sorted(missing_keys))
+        models_updated.add(model_key)
+
+    if not models_updated:
         logging.info("All existing entries are structurally complete.")
     return models_updated
 
-def sync_disk_to_config(config_models: Dict[str, Any], disk_models: Dict[str, str], prune: bool) -> Tuple[int, int]:
-    """Adds new models and removes stale ones. Returns counts of added/removed models."""
-    models_added, models_removed = 0, 0
+def sync_disk_to_config(config_models: Dict[str, Any], disk_models: Dict[str, str], prune: bool) -> Tuple[Set[str], Set[str]]:
+    """Adds new models and removes stale ones. Returns the added and removed keys."""
+    models_added: Set[str] = set()
+    models_removed: Set[str] = set()
     
-    # Build mapping of safe keys for disk models with collision detection
-    disk_safe_keys = {}
-    for filepath in disk_models.values():
-        safe_key = create_safe_model_key(filepath)
-        
-        # Check for collision
-        if safe_key in disk_safe_keys:
-            logging.error(f"Key collision detected: '{safe_key}' for both:")
-            logging.error(f"  - {disk_safe_keys[safe_key]}")
-            logging.error(f"  - {filepath}")
-            logging.error("This is a critical error. Cannot continue safely.")
-            sys.exit(1)
-        
-        disk_safe_keys[safe_key] = filepath
+    # Build mapping of safe keys for disk models; collisions show up as a shorter dict
+    make_key = create_safe_model_key
+    pairs = [(make_key(filepath), filepath) for filepath in disk_models.values()]
+    disk_safe_keys = dict(pairs)
+    if len(disk_safe_keys) != len(pairs):
+        # Report every colliding key at once rather than stopping at the first
+        for safe_key, count in Counter(key for key, _ in pairs).most_common():
+            if count < 2:
+                break
+            logging.error(f"Key collision detected: '{safe_key}' for:")
+            for key, filepath in pairs:
+                if key == safe_key:
+                    logging.error(f"  - {filepath}")
+        logging.error("This is a critical error. Cannot continue safely.")
+        sys.exit(1)
     
-    disk_keys = set(disk_safe_keys.keys())
-    config_keys = set(config_models.keys())
-
-    new_keys = disk_keys - config_keys
-    for safe_key in sorted(list(new_keys)):
-        filepath = disk_safe_keys[safe_key]
-        logging.info("ADDING: New model file found: '%s' (key: %s)", filepath, safe_key)
-        config_models[safe_key] = create_model_entry(filepath)
-        models_added += 1
-
-    stale_keys = config_keys - disk_keys
-    if stale_keys:
-        if prune:
-            for key in sorted(list(stale_keys)):
-                logging.info("REMOVING: Stale entry '%s' as requested.", key)
-                del config_models[key]
-                models_removed += 1
+    # One sorted pass over the union: add what is only on disk, flag what is only in config.
+    # key=str: YAML allows non-string mapping keys (e.g. 2024:), which must not break the sort
+    for key in sorted(disk_safe_keys.keys() | config_models.keys(), key=str):
+        if key in disk_safe_keys:
+            if key not in config_models:
+                filepath = disk_safe_keys[key]
+                logging.info("ADDING: New model file found: '%s' (key: %s)", filepath, key)
+                config_models[key] = create_model_entry(filepath)
+                models_added.add(key)
+        elif prune:
+            logging.info("REMOVING: Stale entry '%s' as requested.", key)
+            models_removed.add(key)
         else:
-            for key in sorted(list(stale_keys)):
-                logging.warning("Stale entry '%s' found (no matching file). Use --prune to remove.", key)
+            logging.warning("Stale entry '%s' found (no matching file). Use --prune to remove.", key)
     
-    return models_added, models_removed
-
-def prepare_config_for_save(config_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Creates a deep copy of config with 'cmd' fields wrapped in LiteralString."""
-    save_data = copy.deepcopy(config_data)
+    if len(models_removed) > len(config_models) // 4:
+        # Pruning a large share: rebuild compactly in place (callers hold this dict) rather than deleting one by one
+        kept = {k: v for k, v in config_models.items() if k not in models_removed}
+        config_models.clear()
+        config_models.update(kept)
+    else:
+        for key in models_removed:
+            del config_models[key]
     
-    if 'models' in save_data and isinstance(save_data['models'], dict):
-        for model_entry in save_data['models'].values():
-            if isinstance(model_entry, dict) and 'cmd' in model_entry:
-                if not isinstance(model_entry['cmd'], str):
-                    model_entry['cmd'] = str(model_entry['cmd'])
-                model_entry['cmd'] = LiteralString(model_entry['cmd'])
-    return save_data
+    return models_added, models_removed
 
 def save_config(config_path: str, config_data: Dict[str, Any], dry_run: bool) -> None:
     """Atomically saves the configuration with corrected formatting."""
@@ -280,34 +358,160 @@ def save_config(config_path: str, config_data: Dict[str, Any], dry_run: bool) ->
         logging.info("DRY RUN: Would save changes to '%s'.", config_path)
         return
 
-    save_data = prepare_config_for_save(config_data)
-    temp_path = f"{config_path}.tmp"
+    # Every model's cmd is written as a '|' block, single-line or not. Wrapped in place instead of on a
+    # deep copy; LiteralString is a str, so the config data stays usable after the save.
+    models = config_data.get('models')
+    if isinstance(models, dict):
+        for model_entry in models.values():
+            if isinstance(model_entry, dict) and 'cmd' in model_entry:
+                model_entry['cmd'] = LiteralString(model_entry['cmd'])
+
+    config_dir = os.path.dirname(os.path.abspath(config_path))
     try:
-        with open(temp_path, 'w', encoding='utf-8') as f:
+        mode = stat.S_IMODE(os.stat(config_path).st_mode)
+    except FileNotFoundError:
+        mode = None
+    temp_path = None
+    try:
+        # Unique temp file next to the config, so the final os.replace stays on one filesystem
+        with tempfile.NamedTemporaryFile('wb', buffering=YAML_IO_BUFFER, dir=config_dir,
+                                         prefix=f".{os.path.basename(config_path)}.", suffix='.tmp',
+                                         delete=False) as f:
+            temp_path = f.name
             # Using explicit settings to prevent '? key:' format
             # YAML_WIDTH set to 120 to balance line length with readability
             yaml.dump(
-                save_data, f,
-                Dumper=yaml.SafeDumper,
+                config_data, f,
+                Dumper=_Dumper,
                 sort_keys=False,
                 indent=2,
                 width=YAML_WIDTH,
                 default_flow_style=False,
-                allow_unicode=True
+                allow_unicode=True,
+                encoding='utf-8'
             )
+            # Make the data durable before the rename so a crash can't leave an empty config behind
+            f.flush()
+            os.fsync(f.fileno())
+        # NamedTemporaryFile creates 0600; keep the existing config's permissions (or the umask default)
+        os.chmod(temp_path, mode if mode is not None else 0o666 & ~_current_umask())
         os.replace(temp_path, config_path)
+        temp_path = None
+        _fsync_dir(config_dir)
         logging.info("Successfully updated '%s'.", config_path)
     except (OSError, yaml.YAMLError) as e:
         logging.critical("Failed to write to config file '%s'. Error: %s", config_path, e)
-        if os.path.exists(temp_path):
+        if temp_path is not None:
             try:
-                os.remove(temp_path)
+                os.unlink(temp_path)
             except OSError:
                 pass
         sys.exit(1)
 
+def _current_umask() -> int:
+    """Returns the process umask (os.umask can only be read by setting it)."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+def _fsync_dir(dirpath: str) -> None:
+    """Flushes a directory entry update (e.g. a rename) to disk; a no-op where directories can't be opened."""
+    if sys.platform == 'win32':
+        return
+    try:
+        dir_fd = os.open(dirpath, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+def _docker_current_context() -> Optional[str]:
+    """Returns the context selected with 'docker context use' (currentContext in the CLI config), if any."""
+    import json
+    config_dir = os.environ.get('DOCKER_CONFIG') or os.path.join(os.path.expanduser('~'), '.docker')
+    try:
+        with open(os.path.join(config_dir, 'config.json'), 'rb') as f:
+            context = json.load(f).get('currentContext')
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, AttributeError) as e:
+        # Can't tell which daemon the CLI talks to; treat it as a non-default context
+        logging.debug(f"Could not read Docker CLI config in '{config_dir}': {e}")
+        return '?'
+    return context if isinstance(context, str) and context else None
+
+def _docker_socket_path() -> Optional[str]:
+    """
+    Returns the local Docker Engine API socket, or None when the CLI should be used instead.
+    The socket is only used when it is the daemon the CLI would talk to: no DOCKER_CONTEXT,
+    a unix:// (or unset) DOCKER_HOST, and no non-default context selected in the CLI config.
+    """
+    if sys.platform == 'win32' or os.environ.get('DOCKER_CONTEXT'):
+        return None
+    host = os.environ.get('DOCKER_HOST')
+    if host:
+        # DOCKER_HOST takes precedence over the CLI's current context
+        if not host.startswith('unix://'):
+            return None
+        path = host[len('unix://'):]
+    else:
+        if _docker_current_context() not in (None, 'default'):
+            return None
+        path = DOCKER_SOCKET
+    return path if os.path.exists(path) else None
+
+def _restart_via_socket(socket_path: str, container_name: str) -> Optional[bool]:
+    """
+    Restarts a container with a single Engine API request over the Unix socket.
+    Returns True once the daemon confirms the restart, False on timeout, or None to let the CLI handle it
+    (socket unusable or any other reply).
+    """
+    # Restart-only dependencies are imported here so no-op and --no-restart runs skip them
+    import json
+    import socket
+    from urllib.parse import quote
+
+    request = (
+        f"POST /containers/{quote(container_name, safe='')}/restart HTTP/1.0\r\n"
+        "Host: docker\r\nContent-Length: 0\r\n\r\n"
+    ).encode('ascii')
+    chunks = []
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(DOCKER_RESTART_TIMEOUT)
+            sock.connect(socket_path)
+            sock.sendall(request)
+            # HTTP/1.0: the daemon closes the connection after the response
+            while chunk := sock.recv(65536):
+                chunks.append(chunk)
+    except TimeoutError:
+        logging.error(f"Timeout while trying to restart container '{container_name}'.")
+        return False
+    except OSError as e:
+        logging.debug(f"Docker socket '{socket_path}' unusable ({e}); falling back to the Docker CLI.")
+        return None
+
+    head, _, body = b''.join(chunks).partition(b'\r\n\r\n')
+    status_line = head.split(b'\r\n', 1)[0].decode('latin-1')
+    status = status_line.split(' ', 2)[1] if status_line.count(' ') >= 1 else ''
+    if status == '204':
+        logging.info(f"{CHECK_MARK} Successfully restarted container '{container_name}'.")
+        return True
+
+    # Any other answer (e.g. 404 from a daemon the CLI doesn't use) goes to the CLI, which reports real errors
+    try:
+        message = json.loads(body).get('message', '')
+    except (ValueError, AttributeError):
+        message = body.decode('utf-8', 'replace').strip()
+    logging.debug(f"Docker socket replied {status_line!r} ({message}); falling back to the Docker CLI.")
+    return None
+
 def restart_docker_container(container_name: str, dry_run: bool) -> None:
-    """Restarts the Docker container using Docker CLI via subprocess."""
+    """Restarts the Docker container via the Engine API socket, falling back to the Docker CLI."""
     logging.info("--- Restarting Docker Container ---")
     if not container_name:
         logging.warning("No container name specified. Skipping restart.")
@@ -316,6 +520,12 @@ def restart_docker_container(container_name: str, dry_run: bool) -> None:
         logging.info("DRY RUN: Would restart Docker container '%s'.", container_name)
         return
     
+    # One request on the local socket instead of spawning the docker CLI
+    socket_path = _docker_socket_path()
+    if socket_path and _restart_via_socket(socket_path, container_name) is not None:
+        return
+
+    import subprocess
     try:
         # Use Docker CLI directly - it handles Windows named pipes correctly
         logging.debug(f"Executing: docker restart {container_name}")
@@ -323,7 +533,7 @@ def restart_docker_container(container_name: str, dry_run: bool) -> None:
             ['docker', 'restart', container_name],
             capture_output=True,
             text=True,
-            timeout=60
+            timeout=DOCKER_RESTART_TIMEOUT
         )
         
         if result.returncode == 0:
@@ -343,30 +553,137 @@ def restart_docker_container(container_name: str, dry_run: bool) -> None:
     except Exception as e:
         logging.error(f"Unexpected error restarting container: {e}")
 
-def run_sync_process(config_path: str, models_dir: str, container_name: str, prune: bool, no_restart: bool, dry_run: bool) -> None:
+def _acquire_lock(lock_path: str) -> Optional[int]:
+    """
+    Takes the sync lock and returns its file descriptor, or None if another run holds it.
+    Uses flock (msvcrt.locking on Windows): the OS drops it when the process exits, so a crash never leaves a stale lock.
+    """
+    # Read-only with a world-readable mode: the lock file outlives each run, and locking it
+    # must not need write access to a file another user (e.g. root) created
+    try:
+        lock_fd = os.open(lock_path, os.O_CREAT | os.O_RDONLY, 0o644)
+    except OSError as e:
+        logging.critical("Cannot open lock file '%s'. Error: %s", lock_path, e)
+        sys.exit(1)
+    try:
+        if fcntl is not None:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            # Byte-range lock on the first byte; released by close() or process exit
+            msvcrt.locking(lock_fd, msvcrt.LK_NBLCK, 1)
+    except OSError:
+        os.close(lock_fd)
+        return None
+    return lock_fd
+
+def _release_lock(lock_fd: int) -> None:
+    """Releases a lock taken by _acquire_lock."""
+    # The lock file is left in place: unlinking it would let a waiting run lock an orphaned inode.
+    # Closing the descriptor drops the lock.
+    try:
+        os.close(lock_fd)
+    except OSError:
+        pass
+
+def _models_tree_stamp(models_dir: str) -> Optional[str]:
+    """
+    Summarizes the models tree as '<dir count>:<newest dir mtime_ns>' from directory entries only.
+    Adding, removing or renaming a file updates its directory's mtime, so files need no stat.
+    Returns None if the tree can't be read.
+    """
+    try:
+        newest = os.stat(models_dir).st_mtime_ns
+        count = 1
+        stack = [models_dir]
+        while stack:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        newest = max(newest, entry.stat(follow_symlinks=False).st_mtime_ns)
+                        count += 1
+                        stack.append(entry.path)
+    except OSError:
+        return None
+    return f"{count}:{newest}"
+
+def _sync_stamp(config_path: str, models_dir: str, tree_stamp: Optional[str], prune: bool) -> Optional[str]:
+    """Builds the stamp identifying the last synced state of the models tree, config file, options and settings."""
+    if tree_stamp is None:
+        return None
+    try:
+        st = os.stat(config_path)
+    except OSError:
+        return None
+    return (f"{tree_stamp} {st.st_mtime_ns}:{st.st_size} prune={int(prune)} "
+            f"settings={_SETTINGS_FINGERPRINT} {os.path.abspath(models_dir)}")
+
+def _read_stamp(stamp_path: str) -> Optional[str]:
+    """Returns the stored sync stamp, or None if there is none."""
+    try:
+        with open(stamp_path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        return None
+
+def _write_stamp(stamp_path: str, stamp: Optional[str]) -> None:
+    """Stores the sync stamp; failures only cost a full sync next time."""
+    if stamp is None:
+        return
+    try:
+        with open(stamp_path, 'w', encoding='utf-8') as f:
+            f.write(stamp)
+    except OSError as e:
+        logging.debug("Could not write sync stamp '%s': %s", stamp_path, e)
+
+def _has_malformed_key_markers(data) -> bool:
+    """Returns True if the config bytes (or a mmap of them) contain PyYAML's '? key' / '  :' complex-key format."""
+    return data.find(b'? ') >= 0 and (data[:3] == b'  :' or data.find(b'\n  :') >= 0)
+
+def run_sync_process(config_path: str, models_dir: str, container_name: str, prune: bool, no_restart: bool, dry_run: bool,
+                     force: bool = False) -> None:
     """Main function to backup, audit, sync, and conditionally restart."""
     lock_path = f"{config_path}.lock"
-    lock_fd = None
     
-    try:
-        lock_fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
-        os.write(lock_fd, str(os.getpid()).encode())
-    except FileExistsError:
-        logging.error("Lock file '%s' exists. Another sync process is running. Exiting.", lock_path)
+    lock_fd = _acquire_lock(lock_path)
+    if lock_fd is None:
+        logging.error("Lock file '%s' is held. Another sync process is running. Exiting.", lock_path)
         sys.exit(1)
 
     try:
         if dry_run:
             logging.warning("DRY RUN MODE IS ACTIVE. No files will be changed and no services will be restarted.")
         
+        # Nothing on disk or in the config changed since the last successful sync: skip all the work.
+        # Only directory mtimes are checked, so --force covers filesystems that don't maintain them.
+        stamp_path = f"{config_path}.sync-stamp"
+        tree_stamp = _models_tree_stamp(models_dir)
+        current_stamp = _sync_stamp(config_path, models_dir, tree_stamp, prune)
+        if not force and current_stamp is not None and current_stamp == _read_stamp(stamp_path):
+            logging.info("--- No changes on disk or in the config since the last sync. Nothing to do (--force to sync anyway). ---")
+            return
+
         # Check for malformed YAML formatting
         formatting_needs_fix = False
-        if os.path.exists(config_path):
-            with open(config_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                if '? ' in content and '\n  :' in content:
-                    logging.info("Detected malformed YAML key format ('? key'). Scheduling a rewrite to fix it.")
-                    formatting_needs_fix = True
+        try:
+            with open(config_path, 'rb') as f:
+                # mmap can't map an empty file; one that small has no markers anyway
+                if os.fstat(f.fileno()).st_size:
+                    try:
+                        # Scan the mapped bytes in C, with no read copy or decode
+                        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                            formatting_needs_fix = _has_malformed_key_markers(mm)
+                    except (OSError, ValueError):
+                        # Some FUSE/network filesystems can't be memory-mapped (ENODEV/EINVAL)
+                        f.seek(0)
+                        formatting_needs_fix = _has_malformed_key_markers(f.read())
+        except FileNotFoundError:
+            pass
+        if formatting_needs_fix:
+            logging.info("Detected malformed YAML key format ('? key'). Scheduling a rewrite to fix it.")
+
+        # hf_utils pulls in huggingface_hub/httpx; import it only once a sync actually runs,
+        # so --help and lock-contention exits stay fast
+        from hf_utils import list_local_gguf_files
 
         manage_backups(config_path, dry_run)
         config_data = load_config(config_path)
@@ -379,7 +696,7 @@ def run_sync_process(config_path: str, models_dir: str, container_name: str, pru
         changes_made = any((models_added, models_updated, models_removed, formatting_needs_fix))
         if changes_made:
             logging.info("--- Saving Changes ---")
-            summary = f"Summary: {models_added} added, {models_updated} updated, {models_removed} removed."
+            summary = f"Summary: {len(models_added)} added, {len(models_updated)} updated, {len(models_removed)} removed."
             if formatting_needs_fix:
                 summary += " (Config formatting will be corrected)."
             logging.info(summary)
@@ -391,35 +708,39 @@ def run_sync_process(config_path: str, models_dir: str, container_name: str, pru
                 logging.info("--no-restart flag detected. Skipping Docker restart.")
         else:
             logging.info("--- No changes needed. Configuration is already up to date. ---")
+
+        if not dry_run:
+            # Record the state this run left behind (config stat is taken after the save)
+            _write_stamp(stamp_path, _sync_stamp(config_path, models_dir, tree_stamp, prune))
     
     finally:
-        if lock_fd is not None:
-            try:
-                os.close(lock_fd)
-            except OSError:
-                pass
-        if os.path.exists(lock_path):
-            try:
-                os.remove(lock_path)
-            except OSError as e:
-                logging.error("Failed to remove lock file '%s': %s", lock_path, e)
+        _release_lock(lock_fd)
+
+def _env_defaults() -> Dict[str, str]:
+    """Returns the defaults for the path/name options, honoring their environment overrides."""
+    return {
+        'config': os.environ.get('LLAMA_SWAP_CONFIG', CONFIG_FILE_PATH),
+        'models_dir': os.environ.get('LLAMA_SWAP_MODELS_DIR', MODELS_DIR),
+        'container': os.environ.get('LLAMA_SWAP_CONTAINER', DOCKER_CONTAINER_NAME),
+    }
 
-def main() -> None:
-    """Parses arguments and runs the sync process."""
+def _build_parser() -> argparse.ArgumentParser:
+    """Builds the full argparse parser (help output, abbreviations, error reporting)."""
+    defaults = _env_defaults()
     parser = argparse.ArgumentParser(
         description="Sync GGUF models with a llama-swap config file.",
         formatter_class=argparse.ArgumentDefaultsHelpFormatter
     )
     parser.add_argument(
-        '--config', default=os.environ.get('LLAMA_SWAP_CONFIG', CONFIG_FILE_PATH),
+        '--config', default=defaults['config'],
         help="Path to the config file. Env: LLAMA_SWAP_CONFIG"
     )
     parser.add_argument(
-        '--models-dir', default=os.environ.get('LLAMA_SWAP_MODELS_DIR', MODELS_DIR),
+        '--models-dir', default=defaults['models_dir'],
         help="Path to the models directory. Env: LLAMA_SWAP_MODELS_DIR"
     )
     parser.add_argument(
-        '--container', default=os.environ.get('LLAMA_SWAP_CONTAINER', DOCKER_CONTAINER_NAME),
+        '--container', default=defaults['container'],
         help="Docker container to restart. Env: LLAMA_SWAP_CONTAINER"
     )
     parser.add_argument(
@@ -434,6 +755,10 @@ def main() -> None:
         '--dry-run', action='store_true',
         help="Show changes without modifying files or services."
     )
+    parser.add_argument(
+        '--force', action='store_true',
+        help="Run a full sync even if nothing changed since the last one."
+    )
     
     log_group = parser.add_mutually_exclusive_group()
     log_group.add_argument(
@@ -444,8 +769,45 @@ def main() -> None:
         '-q', '--quiet', action='store_true',
         help="Enable quiet logging (warnings and errors only)."
     )
+    return parser
+
+_FLAG_OPTIONS = {
+    '--prune': 'prune', '--no-restart': 'no_restart', '--dry-run': 'dry_run', '--force': 'force',
+    '-v': 'verbose', '--verbose': 'verbose', '-q': 'quiet', '--quiet': 'quiet',
+}
+_VALUE_OPTIONS = {'--config': 'config', '--models-dir': 'models_dir', '--container': 'container'}
 
-    args = parser.parse_args()
+def _parse_args_fast(argv: List[str]) -> Optional[argparse.Namespace]:
+    """
+    Parses the common, fully spelled-out command lines without building the argparse parser.
+    Returns None for anything else (help, abbreviations, errors) so argparse can handle it.
+    """
+    args: Dict[str, Any] = _env_defaults()
+    args.update(prune=False, no_restart=False, dry_run=False, force=False, verbose=False, quiet=False)
+    it = iter(argv)
+    for arg in it:
+        if arg in _FLAG_OPTIONS:
+            args[_FLAG_OPTIONS[arg]] = True
+        elif arg in _VALUE_OPTIONS:
+            value = next(it, None)
+            if value is None or value.startswith('-'):
+                return None
+            args[_VALUE_OPTIONS[arg]] = value
+        else:
+            name, sep, value = arg.partition('=')
+            if not sep or name not in _VALUE_OPTIONS:
+                return None
+            args[_VALUE_OPTIONS[name]] = value
+    if args['verbose'] and args['quiet']:
+        return None
+    return argparse.Namespace(**args)
+
+def main() -> None:
+    """Parses arguments and runs the sync process."""
+    # Cron/healthcheck invocations take the fast path; argparse is only built when needed
+    args = _parse_args_fast(sys.argv[1:])
+    if args is None:
+        args = _build_parser().parse_args()
 
     log_level = logging.INFO
     if args.verbose:
@@ -458,6 +820,15 @@ def main() -> None:
         format='%(asctime)s - %(levelname)s - %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
+    # The format only uses time, level and message: skip per-record thread/process lookups
+    # and the caller stack walk (findCaller) that LogRecord creation does by default
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    logging._srcfile = None
+    if not LIBYAML_AVAILABLE:
+        logging.warning("PyYAML was built without libyaml; using the much slower pure-Python parser. "
+                        "Install libyaml (e.g. libyaml-dev) and reinstall PyYAML to speed up large configs.")
 
     run_sync_process(
         config_path=args.config,
@@ -465,7 +836,8 @@ def main() -> None:
         container_name=args.container,
         prune=args.prune,
         no_restart=args.no_restart,
-        dry_run=args.dry_run
+        dry_run=args.dry_run,
+        force=args.force
     )
 
 if __name__ == '__main__':
@@ -11,57 +11,104 @@ Version: 0.2.0
 import logging
 import os
 import sys
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator
 from huggingface_hub import HfApi
 
 from hf_utils import (
-    create_hash_file, download_with_progress, get_remote_lfs_hash,
-    verify_file_hash
+    compare_file_hash, create_hash_file, download_with_hash, get_remote_lfs_hash_from_info, get_repo_info
 )
 
 # --- CONFIGURATION ---
 MODELS_DIR = './models'
+# Concurrent Hugging Face metadata requests when checking for updates
+CHECK_WORKERS = max(1, int(os.getenv('LLAMA_SWAP_CHECK_WORKERS', '16')))
 
 # --- CROSS-PLATFORM SYMBOLS ---
 CHECK_MARK = "✓" if sys.platform != "win32" else "[OK]"
 CROSS_MARK = "✗" if sys.platform != "win32" else "[X]"
 
+def _iter_hash_dirs(root_dir: str) -> Iterator[tuple[str, set[str], list[os.DirEntry]]]:
+    """
+    Walks root_dir with os.scandir and yields (directory, names of its non-directory entries,
+    its .sha256 entries) for each directory containing hash files. The name set lets callers
+    check for the model file next to each hash file without another stat.
+    """
+    stack = [root_dir]
+    while stack:
+        directory = stack.pop()
+        names: set[str] = set()
+        hash_entries: list[os.DirEntry] = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        continue
+                    names.add(entry.name)
+                    if entry.name.endswith('.sha256'):
+                        hash_entries.append(entry)
+        except OSError as e:
+            logging.debug(f"Skipping unreadable directory '{directory}': {e}")
+            continue
+        if hash_entries:
+            yield directory, names, hash_entries
+
 def find_managed_models(root_dir: str) -> list[dict]:
     """Scans for .sha256 files and returns a list of managed models."""
     managed_models = []
     logging.info(f"Scanning for managed models in '{root_dir}'...")
     
-    for hash_path in Path(root_dir).rglob('*.sha256'):
-        try:
-            with open(hash_path, 'r') as f:
-                content = f.read().strip().split()
-                if len(content) < 2:
-                    logging.warning(f"Skipping malformed hash file: {hash_path}")
-                    continue
-                
-                local_hash = content[0]
-                filename = " ".join(content[1:]) # Handle filenames with spaces
-                
-                model_path = hash_path.with_suffix('')
-                if not model_path.exists():
-                    logging.warning(f"Model file for {hash_path} not found. Skipping.")
-                    continue
-
-                repo_path = model_path.parent.relative_to(root_dir)
-                repo_id = '/'.join(repo_path.parts)
-
-                managed_models.append({
-                    "repo_id": repo_id,
-                    "filename": filename,
-                    "local_path": str(model_path),
-                    "local_hash": local_hash,
-                })
-        except Exception as e:
-            logging.error(f"Error processing hash file {hash_path}: {e}")
+    for directory, names, hash_entries in _iter_hash_dirs(root_dir):
+        # All models in one directory share a repo_id
+        repo_path = os.path.relpath(directory, root_dir)
+        repo_id = '' if repo_path == os.curdir else repo_path.replace(os.sep, '/')
+
+        for hash_entry in hash_entries:
+            hash_path = hash_entry.path
+            try:
+                with open(hash_path, 'r') as f:
+                    content = f.read().strip().split()
+                    if len(content) < 2:
+                        logging.warning(f"Skipping malformed hash file: {hash_path}")
+                        continue
+
+                    local_hash = content[0]
+                    filename = " ".join(content[1:]) # Handle filenames with spaces
+
+                    # The sibling listing from the same scandir pass stands in for an exists() stat
+                    if hash_entry.name[:-len('.sha256')] not in names:
+                        logging.warning(f"Model file for {hash_path} not found. Skipping.")
+                        continue
+
+                    managed_models.append({
+                        "repo_id": repo_id,
+                        "filename": filename,
+                        "local_path": hash_path[:-len('.sha256')],
+                        "local_hash": local_hash,
+                    })
+            except Exception as e:
+                logging.error(f"Error processing hash file {hash_path}: {e}")
             
     logging.info(f"Found {len(managed_models)} managed models.")
     return managed_models
 
+def fetch_repo_infos(api: HfApi, repo_ids: set[str]) -> dict[str, Any]:
+    """
+    Fetches metadata for each repo concurrently (the requests are network-bound).
+    Maps repo_id to its repo_info, or to the exception raised while fetching it.
+    """
+    def fetch(repo_id: str) -> Any:
+        logging.info(f"Fetching repository metadata for {repo_id}...")
+        try:
+            return get_repo_info(api, repo_id)
+        except Exception as e:
+            return e
+
+    ordered = sorted(repo_ids)
+    with ThreadPoolExecutor(max_workers=min(CHECK_WORKERS, len(ordered) or 1)) as pool:
+        return dict(zip(ordered, pool.map(fetch, ordered)))
+
 def validate_selection_input(choice: str, max_options: int) -> list[int] | None:
     """
     Validates and parses user input for model selection.
@@ -113,8 +160,14 @@ def main():
 
     outdated_models = []
     logging.info("\n--- Checking for updates ---")
+    # One request per repo, issued in parallel; results are then read back in scan order
+    repo_infos = fetch_repo_infos(api, {model['repo_id'] for model in local_models})
     for model in local_models:
-        remote_hash = get_remote_lfs_hash(api, model['repo_id'], model['filename'])
+        repo_info = repo_infos[model['repo_id']]
+        if isinstance(repo_info, Exception):
+            logging.error(f"Failed to retrieve repository metadata for {model['repo_id']}: {repo_info}")
+            continue
+        remote_hash = get_remote_lfs_hash_from_info(repo_info, model['filename'])
         if remote_hash and remote_hash.lower() != model['local_hash'].lower():
             model['remote_hash'] = remote_hash
             outdated_models.append(model)
@@ -166,8 +219,8 @@ def main():
     for model in models_to_update:
         dest_path = os.path.dirname(model['local_path'])
         
-        # Download the updated file
-        downloaded_file = download_with_progress(model['repo_id'], model['filename'], dest_path, 5, 10)
+        # Download the updated file, hashing it as it is written (no second read for verification)
+        downloaded_file, actual_hash = download_with_hash(model['repo_id'], model['filename'], dest_path, 5, 10)
         
         if not downloaded_file:
             logging.error(f"Update failed for {model['filename']}. Skipping.")
@@ -175,7 +228,8 @@ def main():
             continue
         
         # Verify and create new hash file
-        if verify_file_hash(downloaded_file, model['remote_hash']):
+        logging.info(f"Verifying file integrity for {os.path.basename(downloaded_file)}...")
+        if compare_file_hash(downloaded_file, actual_hash, model['remote_hash']):
             create_hash_file(downloaded_file, model['remote_hash'])
             successful_updates += 1
         else: